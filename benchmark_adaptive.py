@@ -0,0 +1,113 @@
+import __init__
+import gymnasium as gym
+import time
+
+N_EPISODES = 30
+RETURN_TOLERANCE = 0.02  # relative difference allowed on the total return
+SCENARIOS = {
+    "default traffic": {},
+    "sparse traffic": {"vehicles_count": 3},
+}
+
+LANE_RIGHT, IDLE = 2, 1
+
+
+def policy(env):
+    """Leave the cone lane, then keep lane and speed (lets free flow happen)."""
+    return LANE_RIGHT if env.vehicle.lane_index[2] == 0 else IDLE
+
+
+class Runner:
+    """One env, with the time spent in env.step() and in the dynamics (_simulate)."""
+
+    def __init__(self, config, adaptive):
+        self.env = gym.make("highway-construction-v0")
+        self.inner = self.env.unwrapped
+        self.inner.configure(dict(config, adaptive_stepping=adaptive))
+        self.returns, self.crashes = [], []
+        self.step_time, self.simulate_time = 0.0, 0.0
+        self.decisions, self.periods, self.chunked = 0, 0, 0
+
+        simulate = self.inner._simulate
+
+        def timed_simulate(action=None):
+            start = time.perf_counter()
+            free_flow = simulate(action)
+            self.simulate_time += time.perf_counter() - start
+            self.chunked += bool(free_flow)
+            self.periods += 1
+            return free_flow
+
+        self.inner._simulate = timed_simulate
+
+    def play(self, seed):
+        """Play one seeded episode with the fixed policy."""
+        self.env.reset(seed=seed)
+        ep_ret = 0.0
+        while True:
+            start = time.perf_counter()
+            _, reward, terminated, truncated, info = self.env.step(policy(self.inner))
+            self.step_time += time.perf_counter() - start
+            self.decisions += 1
+            ep_ret += reward
+            if terminated or truncated:
+                break
+        self.returns.append(ep_ret)
+        self.crashes.append(bool(info["crashed"]))
+
+    def summary(self):
+        n_episodes = len(self.returns)
+        return {
+            "returns": self.returns,
+            "crashes": self.crashes,
+            "episode_ms": 1000 * self.step_time / n_episodes,
+            "simulate_ms": 1000 * self.simulate_time / n_episodes,
+            "decisions": self.decisions / n_episodes,
+            "chunked": self.chunked / self.periods,
+        }
+
+
+def bench(config, n_episodes=N_EPISODES):
+    """
+    Play the same seeded episodes at full rate and with adaptive stepping.
+    Episodes alternate between the two envs so that machine load drifts
+    affect both timings alike.
+    """
+    base, adaptive = Runner(config, adaptive=False), Runner(config, adaptive=True)
+    for seed in range(n_episodes):
+        base.play(seed)
+        adaptive.play(seed)
+    base.env.close()
+    adaptive.env.close()
+    return base.summary(), adaptive.summary()
+
+
+def compare(base, adaptive):
+    """Crash outcomes must match and returns agree within RETURN_TOLERANCE."""
+    crash_mismatches = sum(a != b for a, b in zip(base["crashes"], adaptive["crashes"]))
+    rel_diffs = [abs(a - b) / max(abs(a), 1.0)
+                 for a, b in zip(base["returns"], adaptive["returns"])]
+    exact = sum(d == 0 for d in rel_diffs)
+    ok = crash_mismatches == 0 and max(rel_diffs) <= RETURN_TOLERANCE
+    return ok, crash_mismatches, max(rel_diffs), exact
+
+
+if __name__ == "__main__":
+    all_ok = True
+    for name, config in SCENARIOS.items():
+        base, adaptive = bench(config)
+        ok, crash_mismatches, max_diff, exact = compare(base, adaptive)
+        all_ok &= ok
+
+        print(f"\n{name}: {N_EPISODES} seeded episodes, per-episode averages")
+        print(f"{'':10}{'steps [ms]':>12}{'dynamics [ms]':>15}{'decisions':>11}{'chunked':>11}")
+        for label, r in (("full rate", base), ("adaptive", adaptive)):
+            print(f"{label:10}{r['episode_ms']:12.1f}{r['simulate_ms']:15.1f}"
+                  f"{r['decisions']:11.1f}{r['chunked']:11.1%}")
+        print(f"Episode speed-up:  {base['episode_ms'] / adaptive['episode_ms']:.2f}x")
+        print(f"Dynamics speed-up: {base['simulate_ms'] / adaptive['simulate_ms']:.2f}x")
+        print(f"Crash mismatches: {crash_mismatches}, max return difference: {max_diff:.2%}, "
+              f"identical returns: {exact}/{N_EPISODES} -> {'OK' if ok else 'FAIL'}")
+
+    print(f"\nTolerance check ({RETURN_TOLERANCE:.0%} on returns, same crashes): "
+          f"{'OK' if all_ok else 'FAIL'}")
@@ -0,0 +1,75 @@
+import __init__
+import gymnasium as gym
+import gc
+import time
+import tracemalloc
+
+N_RESETS = 500
+MEMORY_RESETS = 100  # tracemalloc slows everything down, so fewer of these
+WARMUP_RESETS = 20
+
+
+def bench(vehicle_pool, n_resets=N_RESETS):
+    """
+    Time env.reset() and the scene construction (_reset) on its own, then
+    measure peak traced memory over a separate, shorter run.
+
+    Pooling is a scene-construction optimisation: it shows up in the scene
+    time, peak memory and GC runs, while full reset() latency is dominated
+    by building the first observation and barely moves.
+    """
+    env = gym.make("highway-construction-v0")
+    inner = env.unwrapped
+    inner.configure({"vehicle_pool": vehicle_pool})
+
+    for i in range(WARMUP_RESETS):
+        env.reset(seed=i)
+
+    gc.collect()
+    gc_before = sum(s["collections"] for s in gc.get_stats())
+
+    start = time.perf_counter()
+    for i in range(n_resets):
+        env.reset(seed=i)
+    total_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for i in range(n_resets):
+        inner._reset()
+    scene_time = time.perf_counter() - start
+
+    gc_runs = sum(s["collections"] for s in gc.get_stats()) - gc_before
+
+    gc.collect()
+    tracemalloc.start()
+    for i in range(MEMORY_RESETS):
+        env.reset(seed=i)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    env.close()
+
+    return {
+        "reset_ms": 1000 * total_time / n_resets,
+        "scene_ms": 1000 * scene_time / n_resets,
+        "peak_kb": peak / 1024,
+        "gc_runs": gc_runs,
+    }
+
+
+if __name__ == "__main__":
+    results = {
+        "no pool": bench(vehicle_pool=False),
+        "pool": bench(vehicle_pool=True),
+    }
+
+    print(f"\n{N_RESETS} resets (peak memory over {MEMORY_RESETS})")
+    print(f"{'':10}{'reset [ms]':>12}{'scene [ms]':>12}{'peak [KiB]':>12}{'gc runs':>10}")
+    for name, r in results.items():
+        print(f"{name:10}{r['reset_ms']:12.3f}{r['scene_ms']:12.3f}{r['peak_kb']:12.1f}{r['gc_runs']:10d}")
+
+    base, pooled = results["no pool"], results["pool"]
+    print(f"\nScene construction speed-up: {base['scene_ms'] / pooled['scene_ms']:.2f}x")
+    print(f"Full reset speed-up:         {base['reset_ms'] / pooled['reset_ms']:.2f}x")
+    # Pooling only touches scene construction; the rest of reset() (mostly the
+    # first Kinematics observation) costs the same either way
+    print(f"Scene construction share of a reset: {base['scene_ms'] / base['reset_ms']:.0%}")
@@ -0,0 +1,142 @@
+import time
+
+import numpy as np
+import pygame
+from highway_env.envs.common.graphics import EnvViewer, ObservationGraphics
+from highway_env.road.graphics import RoadGraphics, WorldSurface
+from highway_env.vehicle.graphics import VehicleGraphics
+
+
+class ConstructionViewer(EnvViewer):
+    """
+    Viewer for the construction environment with a cached static layer.
+
+    The road (lanes, ramps) and the construction cones stay put, so they
+    are drawn once per episode onto a world-sized layer. Every frame then
+    only blits the visible part of that layer and draws the moving vehicles.
+
+    The layer is rebuilt when the road changes (new episode), when the zoom
+    changes, or once a cone has drifted by a pixel or more (cones are IDM
+    vehicles with a zero target speed and can creep or get knocked away).
+    """
+
+    MAX_LAYER_PIXELS = 16384  # wider or taller roads fall back to per-frame drawing
+    MARGIN = 10.0             # [m] drawn around the road network bounds
+
+    def __init__(self, env, config=None):
+        super().__init__(env, config)
+        self.static_layer = None
+        self._layer_road = None
+        self._layer_scaling = None
+        self._layer_cones = None
+
+    def display(self):
+        if not self.enabled:
+            return
+        # Agent display, trajectories and vehicle histories are only drawn by
+        # the stock viewer
+        if EnvViewer.agent_display or self.vehicle_trajectory or self.env.road.record_history:
+            return super().display()
+
+        if not self._static_layer_valid():
+            self._build_static_layer()
+        if self.static_layer is None:
+            return super().display()
+
+        surface = self.sim_surface
+        surface.move_display_window_to(self.window_position())
+        surface.fill(surface.GREY)
+        surface.blit(self.static_layer, surface.vec2pix(self.static_layer.origin))
+
+        cones = self.env.cones
+        for v in self.env.road.vehicles:
+            if v not in cones:
+                VehicleGraphics.display(v, surface, offscreen=self.offscreen)
+        RoadGraphics.display_road_objects(self.env.road, surface, offscreen=self.offscreen)
+        ObservationGraphics.display(self.env.observation_type, surface)
+
+        if not self.offscreen:
+            self.screen.blit(surface, (0, 0))
+            if self.env.config["real_time_rendering"]:
+                self.clock.tick(self.env.config["simulation_frequency"])
+            pygame.display.flip()
+
+        if self.SAVE_IMAGES and self.directory:
+            pygame.image.save(surface, str(self.directory / f"highway-env_{self.frame}.png"))
+            self.frame += 1
+
+    def _static_layer_valid(self):
+        if self._layer_road is not self.env.road or self._layer_scaling != self.sim_surface.scaling:
+            return False
+        tolerance = 1.0 / self._layer_scaling  # [m] one pixel
+        return all(
+            np.linalg.norm(c.position - p) < tolerance
+            for c, p in zip(self.env.cones, self._layer_cones)
+        )
+
+    def _build_static_layer(self):
+        road = self.env.road
+        scaling = self.sim_surface.scaling
+
+        corners = np.array([
+            lane.position(s, lat)
+            for lane in road.network.lanes_list()
+            for s in (0, lane.length)
+            for lat in (-lane.width_at(s), lane.width_at(s))
+        ])
+        low = corners.min(axis=0) - self.MARGIN
+        high = corners.max(axis=0) + self.MARGIN
+        size = tuple(int(d) + 1 for d in (high - low) * scaling)
+
+        self._layer_road = road
+        self._layer_scaling = scaling
+        self._layer_cones = [c.position.copy() for c in self.env.cones]
+
+        if max(size) > self.MAX_LAYER_PIXELS:
+            self.static_layer = None
+            return
+
+        layer = WorldSurface(size, 0, pygame.Surface(size))
+        layer.scaling = scaling
+        layer.origin = low
+        RoadGraphics.display(road, layer)
+        for cone in self.env.cones:
+            VehicleGraphics.display(cone, layer, offscreen=self.offscreen)
+        self.static_layer = layer
+
+
+class FramePacer:
+    """
+    Real-time pacing for rendered playback.
+
+    Each call to `tick()` is one frame of `period` seconds of simulated time.
+    It sleeps only for whatever is left of the frame after stepping, predicting
+    and drawing, and returns False (drop this frame) when playback is already
+    more than a frame behind, so viewing never drifts slower than real time.
+    """
+
+    MAX_LAG = 1.0  # [s] beyond this, resynchronise instead of dropping frames
+
+    def __init__(self, period):
+        self.period = period
+        self.next_time = None
+
+    def reset(self):
+        """Restart the schedule, e.g. after a pause between episodes."""
+        self.next_time = None
+
+    def tick(self):
+        now = time.perf_counter()
+        if self.next_time is None:
+            self.next_time = now
+        late = now - self.next_time
+        self.next_time += self.period
+
+        if late > self.MAX_LAG:
+            self.next_time = now + self.period
+            return False
+        if late > self.period:
+            return False
+        if late < 0:
+            time.sleep(-late)
+        return True
@@ -5,12 +5,13 @@ import sys
 import os
 from sb3_contrib import QRDQN
 
-from stable_baselines3.common.monitor import Monitor
 from stable_baselines3.common.vec_env import DummyVecEnv, VecNormalize
 
+from telemetry import TelemetryMonitor
+
 OUTDIR = "data"
 MODEL_NAME = "qrdqn_agent_final"
-VEC_NORM_STATS_FILE = f"{OUTDIR}/vec_normalize_stats.pkl" 
+VEC_NORM_STATS_FILE = f"{OUTDIR}/{MODEL_NAME}_vec_normalize_stats.pkl" 
 monitor_log_path = f"{OUTDIR}/monitor.csv"
 modelFile = f"{OUTDIR}/{MODEL_NAME}.zip" 
 saveAs = f"{OUTDIR}/{MODEL_NAME}.zip"
@@ -24,11 +25,10 @@ def create_env():
         render_mode="rgb_array",
     )
     # Use override_existing=False to append data during continued training
-    env = Monitor(
+    env = TelemetryMonitor(
         env,
         filename=monitor_log_path,
-        allow_early_resets=True,
-        override_existing=False, 
+        override_existing=False,
     )
     return env
 
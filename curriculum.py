@@ -0,0 +1,46 @@
+from stable_baselines3.common.callbacks import BaseCallback
+
+
+class CurriculumCallback(BaseCallback):
+    """
+    Moves the training envs through config stages as training progresses.
+
+    `stages` is a list of (start timestep, config changes), sorted by start.
+    When training reaches a stage, its changes are sent to every env with
+    `env_method("queue_config", ...)` and take effect at each env's next
+    reset, so running workers, the road cache, the vehicle pool and the
+    replay buffer all carry over. The current stage is also sent at the
+    start of training, so resumed runs pick up where they were.
+
+    :param stages: [(start_timestep, config), ...]
+    :param verbose: print stage changes if > 0
+    """
+
+    def __init__(self, stages, verbose=0):
+        super().__init__(verbose)
+        self.stages = sorted(stages, key=lambda stage: stage[0])
+        self.stage = None
+
+    def _current_stage(self):
+        stage = 0
+        for i, (start, _) in enumerate(self.stages):
+            if self.num_timesteps >= start:
+                stage = i
+        return stage
+
+    def _enter_stage(self, stage):
+        self.stage = stage
+        _, config = self.stages[stage]
+        self.training_env.env_method("queue_config", config)
+        self.logger.record("curriculum/stage", stage)
+        if self.verbose > 0:
+            print(f"Curriculum stage {stage} at {self.num_timesteps} timesteps: {config}")
+
+    def _on_training_start(self):
+        self._enter_stage(self._current_stage())
+
+    def _on_step(self):
+        stage = self._current_stage()
+        if stage != self.stage:
+            self._enter_stage(stage)
+        return True
@@ -0,0 +1,178 @@
+import argparse
+import gymnasium as gym
+import highway_env
+import numpy as np
+import pandas as pd
+from itertools import combinations
+from statistics import NormalDist
+from sb3_contrib import QRDQN
+from stable_baselines3.common.vec_env import DummyVecEnv, VecNormalize
+
+
+import os
+import sys
+
+parent_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, parent_dir)
+
+import __init__
+
+# name -> (model file, VecNormalize stats file it was trained with)
+# Default line-up (the shipped model); pass others with --model
+MODELS = {
+    "high_gamma": ("qrdqn_agent_final.zip", "qrdqn_agent_final_vec_normalize_stats.pkl"),
+}
+
+BATCH_EPISODES = 10    # scenarios added between two looks at the results
+MIN_EPISODES = 20
+MAX_EPISODES = 300
+ALPHA = 0.05           # family-wise error rate over all looks and comparisons
+SEED_OFFSET = 10_000   # keep evaluation scenarios away from training seeds
+
+OUT_FILE = "tournament_results.csv"
+
+
+def create_env():
+    env = gym.make(
+        "highway-construction-v0",
+        render_mode="rgb_array",
+    )
+    return env
+
+
+def load_player(model_path, stats_path):
+    """Load a model and the observation normalization it was trained with."""
+    # Every training script normalizes observations: a model fed raw
+    # observations plays far worse, which would bias the comparison
+    if not stats_path or not os.path.exists(stats_path):
+        raise FileNotFoundError(
+            f"VecNormalize stats for {model_path} not found at {stats_path}")
+    # The pickled training LR schedule is not needed (and may not unpickle) here
+    model = QRDQN.load(model_path, custom_objects={
+        "learning_rate": 0.0,
+        "lr_schedule": lambda _: 0.0,
+    })
+    vec_norm = VecNormalize.load(stats_path, DummyVecEnv([create_env]))
+    vec_norm.training = False
+    return model, vec_norm
+
+
+def run_episode(env, model, vec_norm, seed):
+    """Play one seeded scenario and return (episode return, crashed)."""
+    obs, _ = env.reset(seed=seed)
+    ep_ret = 0.0
+
+    while True:
+        obs = vec_norm.normalize_obs(obs)
+        action, _ = model.predict(obs, deterministic=True)
+        obs, reward, terminated, truncated, info = env.step(action)
+        ep_ret += reward
+
+        if terminated or truncated:
+            return ep_ret, bool(info["crashed"])
+
+
+def paired_interval(diffs, z):
+    """Mean of paired differences with a normal-approximation confidence interval."""
+    mean = diffs.mean()
+    half_width = z * diffs.std(ddof=1) / np.sqrt(len(diffs))
+    return mean, mean - half_width, mean + half_width
+
+
+def critical_z(n_models):
+    """
+    Bonferroni-corrected z over every pair of models at every look, so both
+    stopping as soon as the ranking looks settled and reporting all pairwise
+    intervals keep the family-wise error rate at ALPHA.
+    """
+    max_looks = 1 + int(np.ceil((MAX_EPISODES - MIN_EPISODES) / BATCH_EPISODES))
+    n_tests = max(n_models * (n_models - 1) // 2, 1) * max_looks
+    return NormalDist().inv_cdf(1 - ALPHA / (2 * n_tests))
+
+
+def ranking_settled(returns, names, z):
+    """True once every adjacent pair of the return ranking is significantly different."""
+    ranked = sorted(names, key=lambda name: np.mean(returns[name]), reverse=True)
+    for better, worse in zip(ranked, ranked[1:]):
+        diffs = np.array(returns[better]) - np.array(returns[worse])
+        _, low, _ = paired_interval(diffs, z)
+        if low <= 0:
+            return False
+    return True
+
+
+def tournament(models=MODELS):
+    """
+    Run every model on the same seeded scenarios (common random numbers),
+    in batches, until the ranking is settled or MAX_EPISODES is reached.
+    """
+    players = {name: load_player(*paths) for name, paths in models.items()}
+    names = list(players)
+    env = create_env()
+    z = critical_z(len(names))
+
+    returns = {name: [] for name in names}
+    crashes = {name: [] for name in names}
+    rows = []
+
+    n = 0
+    while n < MAX_EPISODES:
+        for seed in range(SEED_OFFSET + n, SEED_OFFSET + n + BATCH_EPISODES):
+            for name, (model, vec_norm) in players.items():
+                ep_ret, crashed = run_episode(env, model, vec_norm, seed)
+                returns[name].append(ep_ret)
+                crashes[name].append(crashed)
+                rows.append(dict(model=name, seed=seed, ret=ep_ret, crashed=crashed))
+        n += BATCH_EPISODES
+
+        if n >= MIN_EPISODES and ranking_settled(returns, names, z):
+            print(f"Ranking settled after {n} scenarios.")
+            break
+    else:
+        print(f"Ranking not settled after {MAX_EPISODES} scenarios.")
+
+    env.close()
+    return returns, crashes, pd.DataFrame(rows), z
+
+
+def report(returns, crashes, z):
+    n = len(next(iter(returns.values())))
+    ranked = sorted(returns, key=lambda name: np.mean(returns[name]), reverse=True)
+
+    print(f"\n{n} common scenarios per model")
+    for rank, name in enumerate(ranked, 1):
+        print(f"{rank}. {name:20s} return={np.mean(returns[name]):8.2f}  "
+              f"crash rate={np.mean(crashes[name]):.2f}")
+
+    if len(ranked) < 2:
+        return
+    print(f"\nPaired differences (first - second), z={z:.2f}")
+    for a, b in combinations(ranked, 2):
+        r_mean, r_low, r_high = paired_interval(np.array(returns[a]) - np.array(returns[b]), z)
+        c_mean, c_low, c_high = paired_interval(
+            np.array(crashes[a], dtype=float) - np.array(crashes[b], dtype=float), z)
+        print(f"{a} vs {b}: return {r_mean:+.2f} [{r_low:+.2f}, {r_high:+.2f}]  "
+              f"crash rate {c_mean:+.3f} [{c_low:+.3f}, {c_high:+.3f}]")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Compare models on common seeded scenarios.")
+    parser.add_argument(
+        "--model", nargs=3, action="append", metavar=("NAME", "MODEL", "STATS"),
+        help="model to enter, with its VecNormalize stats file (repeat for each model; "
+             f"default: {', '.join(MODELS)})")
+    args = parser.parse_args()
+    if args.model is None:
+        return MODELS
+    models = {name: (model_path, stats_path) for name, model_path, stats_path in args.model}
+    if len(models) < len(args.model):
+        parser.error("model names must be unique")
+    return models
+
+
+if __name__ == "__main__":
+    returns, crashes, results, z = tournament(parse_args())
+    results.to_csv(OUT_FILE, index=False)
+    report(returns, crashes, z)
+
+    print(f"\nPer-episode results saved to {OUT_FILE}")
@@ -1,10 +1,13 @@
 import numpy as np
-import random  # important for cone pattern randomness
 from highway_env.envs.highway_env import HighwayEnv
 from highway_env.road.road import Road, RoadNetwork
 from highway_env.road.lane import StraightLane
 from highway_env.vehicle.behavior import IDMVehicle
 
+from construction_viewer import ConstructionViewer
+from traffic_manager import TrafficManager
+from vehicle_pool import VehiclePool
+
 
 class HighwayConstructionEnv(HighwayEnv):
     """
@@ -26,6 +29,22 @@ class HighwayConstructionEnv(HighwayEnv):
         * clipped rewards for stability
     """
 
+    BASE_SPEED = 30.0  # approx. 67 mph
+    CONSTRUCTION_ZONE = (380, 480)  # [m] stretch of road around the cones
+    SPEED_BAND = (60, 65, 70)       # [mph] lower, optimal, upper
+
+    def __init__(self, config=None, render_mode=None):
+        # Kept across resets (the base constructor already resets once)
+        self._road_networks = {}
+        self._vehicle_pool = VehiclePool()
+        self.cones = []
+        self._last_lane_index = None
+        # Config changes queued by queue_config(), applied on the next reset
+        self._pending_config = {}
+        # Optional construction_viewer.FramePacer for real-time human rendering
+        self.frame_pacer = None
+        super().__init__(config, render_mode)
+
     @classmethod
     def default_config(cls):
         cfg = super().default_config()
@@ -41,6 +60,25 @@ class HighwayConstructionEnv(HighwayEnv):
             "centering_position": [0.3, 0.5],
             "simulation_frequency": 10,
             "policy_frequency": 5,
+            # Adaptive stepping: while nothing is within the horizon and the ego
+            # is settled in its lane, each policy period is simulated in one
+            # chunk and decision points are skipped (the action is repeated),
+            # so a single step() can cover up to adaptive_max_periods periods
+            # and builds one observation. Episode lengths then count decisions,
+            # not policy periods (see benchmark_adaptive.py).
+            "adaptive_stepping": False,
+            "adaptive_horizon": 60.0,   # [m] longitudinal free-flow radius
+            "adaptive_max_periods": 5,  # policy periods per step at most
+            # Traffic window: recycle cars left behind the ego to just ahead
+            # of it, keeping interaction density constant along the highway.
+            "traffic_window": False,
+            "traffic_window_behind": 100.0,  # [m] despawn distance behind ego
+            "traffic_window_ahead": 300.0,   # [m] furthest respawn ahead of ego
+            # Reuse road network and vehicle objects across resets. This speeds
+            # up scene construction and cuts allocations/GC, not reset() as a
+            # whole, which is dominated by the first observation
+            # (see benchmark_reset.py).
+            "vehicle_pool": True,
         })
         return cfg
 
@@ -48,6 +86,12 @@ class HighwayConstructionEnv(HighwayEnv):
     # ROAD SETUP
     # --------------------------------------------------
     def _create_road(self):
+        key = (self.config["lanes_count"], self.config["highway_length"])
+        if key not in self._road_networks:
+            self._road_networks[key] = self._build_network()
+        self.road = Road(self._road_networks[key], np_random=self.np_random)
+
+    def _build_network(self):
         net = RoadNetwork()
         lane_w = 4.0
         L = self.config["highway_length"]
@@ -68,7 +112,7 @@ class HighwayConstructionEnv(HighwayEnv):
                      StraightLane(np.array([L * 0.8, 0]),
                                   np.array([L * 0.9, -lane_w * 2]), width=lane_w))
 
-        self.road = Road(net, np_random=self.np_random)
+        return net
 
     # --------------------------------------------------
     # VEHICLE SPAWNING
@@ -76,52 +120,203 @@ class HighwayConstructionEnv(HighwayEnv):
     def _create_vehicles(self):
         from highway_env.vehicle.controller import ControlledVehicle
 
-        BASE_SPEED = 30.0  # approx. 67 mph
+        BASE_SPEED = self.BASE_SPEED
+        self._vehicle_pool.release_all()
 
         # Ego in random lane among [0,1,2]
         start_lane = self.np_random.choice([0, 1, 2])
-        ego_lane = self.road.network.get_lane(("a", "b", start_lane))
 
         # Ego always slightly faster than traffic
         ego_speed = BASE_SPEED + 1.0
 
-        ego_vehicle = ControlledVehicle(self.road,
-                                        ego_lane.position(50, 0),
-                                        speed=ego_speed)
+        ego_vehicle = self._spawn("ego", ControlledVehicle,
+                                  ("a", "b", start_lane), 50, ego_speed)
         self.vehicle = ego_vehicle
         self.road.vehicles.append(ego_vehicle)
 
         # Traffic: constant speed ±0.5 m/s for natural variation
+        graph = self.road.network.graph
+        lane_indices = [(_from, _to, i)
+                        for _from, to in graph.items()
+                        for _to, lanes in to.items()
+                        for i in range(len(lanes))]
+        traffic = []
         for _ in range(self.config["vehicles_count"]):
-            lane = self.np_random.choice(self.road.network.lanes_list())
+            lane_index = lane_indices[self.np_random.choice(len(lane_indices))]
             pos = self.np_random.uniform(0, 300)  # traffic near ego for interaction
-            x, y = lane.position(pos, 0)
 
             speed = BASE_SPEED + self.np_random.uniform(-0.5, 0.5)
-            self.road.vehicles.append(IDMVehicle(self.road, [x, y], speed=speed))
+            traffic.append(self._spawn("traffic", IDMVehicle, lane_index, pos, speed))
+        self.road.vehicles.extend(traffic)
+
+        if self.config["traffic_window"]:
+            self.traffic_manager = TrafficManager(
+                self,
+                behind=self.config["traffic_window_behind"],
+                ahead=self.config["traffic_window_ahead"],
+            )
+            self.traffic_manager.reset(traffic)
+        else:
+            self.traffic_manager = None
 
         # --------------------------------------------------
         # RANDOMIZED CONSTRUCTION PATTERN in lane 0
         # --------------------------------------------------
         cone_lane_idx = 0
-        cone_lane = self.road.network.get_lane(("a", "b", cone_lane_idx))
 
-        # Patterns of different lengths—use Python random.choice
+        # Patterns of different lengths, drawn from the env RNG so that a
+        # seeded reset reproduces the whole scenario (cones included)
         cone_patterns = [
             [390, 400, 410, 420, 430, 440],
             [395, 410, 425, 440, 455],
             [400, 415, 430, 445],
             [385, 405, 425, 445]
         ]
-        cone_offsets = random.choice(cone_patterns)
+        cone_offsets = cone_patterns[self.np_random.integers(len(cone_patterns))]
 
         # Place cones
+        self.cones = []
         for offset in cone_offsets:
-            x, y = cone_lane.position(offset, 0)
-            cone = IDMVehicle(self.road, [x, y], speed=0, target_speed=0)
+            cone = self._spawn("cone", IDMVehicle, ("a", "b", cone_lane_idx), offset, 0)
             cone.color = (255, 120, 0)
+            self.cones.append(cone)
             self.road.vehicles.append(cone)
 
+    def _spawn(self, kind, cls, lane_index, longitudinal, speed):
+        """Take a vehicle from the pool, or build a fresh one if pooling is off."""
+        if self.config["vehicle_pool"]:
+            return self._vehicle_pool.acquire(kind, cls, self.road, lane_index,
+                                              longitudinal, speed)
+        lane = self.road.network.get_lane(lane_index)
+        return cls(self.road, lane.position(longitudinal, 0), speed=speed)
+
+    # --------------------------------------------------
+    # RECONFIGURATION
+    # --------------------------------------------------
+    def queue_config(self, config):
+        """
+        Change the config from the next episode on, e.g. from a curriculum.
+
+        Unlike `reset(options={"config": ...})`, this also holds for the
+        automatic resets of a VecEnv, and can be sent to live subprocess
+        workers with `env_method("queue_config", config)`. The road cache and
+        vehicle pool are kept. Observation/action settings must not change,
+        since the learner's spaces are fixed.
+        """
+        self._pending_config.update(config)
+
+    def reset(self, *, seed=None, options=None):
+        if self._pending_config:
+            self.configure(self._pending_config)
+            self._pending_config = {}
+        return super().reset(seed=seed, options=options)
+
+    # --------------------------------------------------
+    # STEPPING
+    # --------------------------------------------------
+    def step(self, action):
+        if not self._adaptive():
+            if self.traffic_manager is not None:
+                self.traffic_manager.update()
+            return super().step(action)
+
+        # Same as AbstractEnv.step, repeated over every policy period the ego
+        # spends in free flow; rewards add up so episode returns are unchanged
+        reward, periods = 0.0, 0
+        while True:
+            if self.traffic_manager is not None:
+                self.traffic_manager.update()
+            self.time += 1 / self.config["policy_frequency"]
+            free_flow = self._simulate(action)
+            reward += self._reward(action)
+            periods += 1
+            terminated = self._is_terminated()
+            truncated = self._is_truncated()
+            if (not free_flow or terminated or truncated
+                    or periods >= self.config["adaptive_max_periods"]):
+                break
+
+        obs = self.observation_type.observe()
+        info = self._info(obs, action)
+        info["policy_periods"] = periods
+        return obs, reward, terminated, truncated, info
+
+    # --------------------------------------------------
+    # RENDERING
+    # --------------------------------------------------
+    def render(self):
+        if self.render_mode is not None and self.viewer is None:
+            self.viewer = ConstructionViewer(self)
+
+        if self.render_mode == "human" and self.frame_pacer is not None:
+            if not self.frame_pacer.tick():
+                # Behind real time: drop this frame, keep intermediate frames on
+                self.enable_auto_render = True
+                return None
+        return super().render()
+
+    # --------------------------------------------------
+    # ADAPTIVE STEPPING
+    # --------------------------------------------------
+    def _adaptive(self):
+        """
+        Adaptive stepping is on. Human rendering always runs at full rate: a
+        chunked step skips the intermediate frames, so the frame pacer would
+        get one tick for several simulated frames and playback would run too fast.
+        """
+        return self.config["adaptive_stepping"] and self.render_mode != "human"
+
+    def _simulate(self, action=None):
+        """
+        Step the dynamics over one policy period, in a single chunk if the ego
+        is in free flow. Returns whether it was, i.e. whether the next
+        decision point may be skipped.
+
+        The action is applied first so that lane changes or speed changes are
+        seen by the free-flow test. If the ego is not free, the usual
+        full-rate loop runs (with the action already forwarded, which is
+        what the base loop does on its first frame anyway).
+
+        Most of the gain comes from the skipped decision points, since the
+        Kinematics observation costs more than the dynamics. With the default
+        traffic the ego is almost never alone within the horizon, so
+        benchmark_adaptive.py only shows a speed-up on sparse traffic.
+        """
+        if not self._adaptive():
+            return super()._simulate(action)
+
+        if action is not None and not self.config["manual_control"]:
+            self.action_type.act(action)
+
+        if not self._in_free_flow():
+            super()._simulate(None)
+            return False
+
+        frames = int(self.config["simulation_frequency"] // self.config["policy_frequency"])
+        self.road.act()
+        self.road.step(frames / self.config["simulation_frequency"])
+        self.steps += frames
+        self.enable_auto_render = False
+        return True
+
+    def _in_free_flow(self):
+        """True if the ego is settled in its lane and nothing is within the horizon."""
+        v = self.vehicle
+        if v.crashed or v.lane_index != v.target_lane_index:
+            return False
+        if abs(v.speed - min(v.target_speed, v.MAX_SPEED)) > 0.1 or abs(v.heading) > 1e-2:
+            return False
+        _, lateral = v.lane.local_coordinates(v.position)
+        if abs(lateral) > 0.1:
+            return False
+
+        horizon = self.config["adaptive_horizon"]
+        ego_x = v.position[0]
+        for other in self.road.vehicles:
+            if other is not v and abs(other.position[0] - ego_x) < horizon:
+                return False
+        return True
+
     # --------------------------------------------------
     # REWARD FUNCTION (FINAL OPTIMIZED)
     # --------------------------------------------------
@@ -130,7 +325,6 @@ class HighwayConstructionEnv(HighwayEnv):
         r = 0.0
 
         mph = v.speed / 0.44704
-        pos_x = v.position[0]
         lane_idx = v.lane_index[2] if hasattr(v, "lane_index") else 1
 
         # 1. Crash penalty
@@ -141,14 +335,14 @@ class HighwayConstructionEnv(HighwayEnv):
         r += 0.1
 
         # 3. Speed shaping (optimal around 65 mph)
-        lower, upper, optimal = 60, 70, 65
-        if lower <= mph <= upper:
+        optimal = self.SPEED_BAND[1]
+        if self._in_speed_band():
             r += 1.0
         else:
             r -= 0.02 * abs(mph - optimal)
 
         # 4. Preferred lanes (1 & 2), penalty for lane 3
-        if not (380 < pos_x < 480):
+        if not self._in_construction_zone():
             if lane_idx in [1, 2]:
                 r += 0.2
             elif lane_idx == 3:
@@ -163,7 +357,7 @@ class HighwayConstructionEnv(HighwayEnv):
                 r -= 0.05
 
         # 6. Construction zone shaping (softer penalty)
-        if 380 < pos_x < 480:
+        if self._in_construction_zone():
             if lane_idx == 0:
                 r -= 2.5
             else:
@@ -192,6 +386,29 @@ class HighwayConstructionEnv(HighwayEnv):
 
         return r
 
+    def _in_construction_zone(self):
+        lower, upper = self.CONSTRUCTION_ZONE
+        return lower < self.vehicle.position[0] < upper
+
+    def _in_speed_band(self):
+        lower, _, upper = self.SPEED_BAND
+        return lower <= self.vehicle.speed / 0.44704 <= upper
+
+    # --------------------------------------------------
+    # INFO (per-step telemetry)
+    # --------------------------------------------------
+    def _info(self, obs, action=None):
+        info = super()._info(obs, action)
+        lane_index = self.vehicle.lane_index
+        last = self._last_lane_index
+        # A lane change is a new lane on the same road segment, not a ramp merge
+        info["lane_change"] = (action is not None and last is not None
+                               and lane_index[:2] == last[:2] and lane_index != last)
+        info["in_construction_zone"] = self._in_construction_zone()
+        info["in_speed_band"] = self._in_speed_band()
+        self._last_lane_index = lane_index
+        return info
+
     # --------------------------------------------------
     # TERMINATION
     # --------------------------------------------------
@@ -207,6 +424,8 @@ class HighwayConstructionEnv(HighwayEnv):
     def _reset(self):
         self._create_road()
         self._create_vehicles()
+        # No lane change can be counted against the previous episode's lane
+        self._last_lane_index = None
 
 
 # --------------------------------------------------
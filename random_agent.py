@@ -2,6 +2,7 @@ import __init__
 import gymnasium as gym
 import time
 import highway_env
+from construction_viewer import FramePacer
 import numpy as np
 
 env = gym.make(
@@ -17,7 +18,10 @@ inner.config["centering_position"] = [0.3, 0.5]
 inner.config["duration"] = 120
 
 SIM_FREQ = env.unwrapped.config["simulation_frequency"]
-PAUSE_TIME = 1 / SIM_FREQ 
+
+# Real-time playback: every rendered frame is one simulation step; the env
+# sleeps only for the time left after stepping and drops frames when behind
+inner.frame_pacer = FramePacer(1 / SIM_FREQ)
 
 def visualize_agent_performance_on_input(model, env, num_episodes=3):
 
@@ -29,8 +33,8 @@ def visualize_agent_performance_on_input(model, env, num_episodes=3):
             
         print(f"\n--- Running Episode {episode + 1}/{num_episodes} ---")
         
-        obs, info = env.reset()
-        env.render() 
+        inner.frame_pacer.reset()
+        obs, info = env.reset()  # renders the first frame in human mode
 
 
         done = False
@@ -47,10 +51,6 @@ def visualize_agent_performance_on_input(model, env, num_episodes=3):
             done = terminated or truncated
             total_reward += reward
             step_count += 1
-
-            env.render() 
-            
-            time.sleep(PAUSE_TIME)
             
         print(f"Episode finished after {step_count} steps. Total Reward: {total_reward:.2f}")
 
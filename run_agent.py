@@ -5,6 +5,7 @@ from sb3_contrib import QRDQN
 
 import time
 import highway_env
+from construction_viewer import FramePacer
 import os 
 
 OUTDIR = "data"
@@ -37,7 +38,10 @@ inner.config["duration"] = 120
 
 #To make the simulation more viewable
 SIM_FREQ = env.unwrapped.config["simulation_frequency"]
-PAUSE_TIME = 1 / SIM_FREQ 
+
+# Real-time playback: every rendered frame is one simulation step; the env
+# sleeps only for the time left after stepping/predicting and drops frames when behind
+inner.frame_pacer = FramePacer(1 / SIM_FREQ)
 
 def visualize_agent_performance_on_input(model, env, num_episodes=3):
 
@@ -48,8 +52,8 @@ def visualize_agent_performance_on_input(model, env, num_episodes=3):
             
         print(f"\nRunning Episode {episode + 1}/{num_episodes}")
         
-        obs, info = env.reset()
-        env.render() 
+        inner.frame_pacer.reset()
+        obs, info = env.reset()  # renders the first frame in human mode
 
         done = False
         step_count = 0
@@ -70,10 +74,6 @@ def visualize_agent_performance_on_input(model, env, num_episodes=3):
             done = terminated or truncated
             total_reward += reward
             step_count += 1
-
-            env.render() 
-            
-            time.sleep(PAUSE_TIME)
             
         print(f"Episode finished after {step_count} steps. Total Reward: {total_reward:.2f}")
 
@@ -0,0 +1,314 @@
+import multiprocessing as mp
+import traceback
+from multiprocessing.shared_memory import SharedMemory
+
+import numpy as np
+from stable_baselines3.common.env_util import is_wrapped
+from stable_baselines3.common.vec_env.base_vec_env import CloudpickleWrapper, VecEnv
+from stable_baselines3.common.vec_env.patch_gym import _patch_env
+
+# Commands written to the shared command array
+STEP = 1
+PIPE = 2   # slow path: the actual command and its arguments come through the pipe
+CLOSE = 3
+
+
+def _layouts(n_envs, observation_space, action_space):
+    """Shape and dtype of every shared array, in the order both sides unpack them."""
+    return [
+        ((n_envs,) + observation_space.shape, observation_space.dtype),  # obs
+        ((n_envs,) + observation_space.shape, observation_space.dtype),  # terminal obs
+        ((n_envs,) + action_space.shape, action_space.dtype),            # actions
+        ((n_envs,), np.float64),                                         # rewards
+        ((n_envs,), np.bool_),                                           # terminated
+        ((n_envs,), np.bool_),                                           # truncated
+        ((n_envs,), np.bool_),                                           # has info
+        ((n_envs,), np.bool_),                                           # error
+        ((n_envs,), np.int32),                                           # command
+    ]
+
+
+def _nbytes(layout):
+    shape, dtype = layout
+    return max(int(np.prod(shape)) * np.dtype(dtype).itemsize, 1)
+
+
+def _view(block, layout):
+    shape, dtype = layout
+    return np.ndarray(shape, dtype=dtype, buffer=block.buf)
+
+
+def _filter_info(info, info_keys):
+    if info_keys is None:
+        return info
+    return {k: info[k] for k in info_keys if k in info}
+
+
+def _worker(index, remote, env_fn_wrapper, start, done, info_keys):
+    env = _patch_env(env_fn_wrapper.var())
+
+    # Handshake: the parent sizes the shared arrays from worker 0's spaces
+    while True:
+        name, data = remote.recv()
+        if name == "get_spaces":
+            remote.send((env.observation_space, env.action_space, env.render_mode))
+        elif name == "attach":
+            break
+    block_names, layouts = data
+    blocks = [SharedMemory(name=block_name) for block_name in block_names]
+    obs, term_obs, actions, rewards, terminated, truncated, has_info, error, command = (
+        _view(block, layout) for block, layout in zip(blocks, layouts)
+    )
+
+    while True:
+        start.acquire()
+        cmd = command[index]
+        # At most one message per command, sent after `done` is released so that
+        # a large reply cannot block the worker while the parent waits on `done`
+        message = None
+        try:
+            if cmd == STEP:
+                has_info[index] = False
+                ob, reward, term, trunc, info = env.step(actions[index])
+                rewards[index] = reward
+                terminated[index] = term
+                truncated[index] = trunc
+                info = _filter_info(info, info_keys)
+                reset_info = {}
+                if term or trunc:
+                    term_obs[index] = ob
+                    ob, reset_info = env.reset()
+                    reset_info = _filter_info(reset_info, info_keys)
+                obs[index] = ob
+                if info or reset_info:
+                    has_info[index] = True
+                    message = (info, reset_info)
+
+            elif cmd == PIPE:
+                name, data = remote.recv()
+                if name == "reset":
+                    seed, options = data
+                    maybe_options = {"options": options} if options else {}
+                    ob, reset_info = env.reset(seed=seed, **maybe_options)
+                    obs[index] = ob
+                    message = _filter_info(reset_info, info_keys)
+                elif name == "render":
+                    message = env.render()
+                elif name == "env_method":
+                    method = env.get_wrapper_attr(data[0])
+                    message = method(*data[1], **data[2])
+                elif name == "get_attr":
+                    message = env.get_wrapper_attr(data)
+                elif name == "set_attr":
+                    message = setattr(env, data[0], data[1])
+                elif name == "is_wrapped":
+                    message = is_wrapped(env, data)
+                else:
+                    raise NotImplementedError(f"`{name}` is not implemented in the worker")
+
+            elif cmd == CLOSE:
+                env.close()
+                remote.close()
+                done.release()
+                break
+
+        except Exception as e:
+            error[index] = True
+            message = (e, traceback.format_exc())
+        done.release()
+        if cmd == PIPE or error[index] or has_info[index]:
+            remote.send(message)
+
+    del obs, term_obs, actions, rewards, terminated, truncated, has_info, error, command
+    for block in blocks:
+        block.close()
+
+
+class SharedMemoryVecEnv(VecEnv):
+    """
+    Multiprocess vectorized env that exchanges step data through shared memory.
+
+    Observations (including terminal ones), rewards, done flags and actions
+    live in shared arrays that workers read and write in place, and each step
+    is synchronised with one semaphore per worker plus a common one, so no
+    pickling happens on the hot path. Infos go through a pipe only when they
+    are non-empty after keeping `info_keys` (default: just the Monitor
+    "episode" entry; None forwards everything). "terminal_observation" and
+    "TimeLimit.truncated" are filled in on the parent side from shared memory.
+
+    Everything else (reset with seed/options, env_method, get_attr, ...)
+    takes the same pipe-based path as SubprocVecEnv.
+
+    :param env_fns: Environments to run in subprocesses
+    :param start_method: method used to start the subprocesses (see SubprocVecEnv)
+    :param info_keys: info entries to forward to the learner, or None for all
+    """
+
+    LIVENESS_INTERVAL = 1.0  # [s] between checks that waited-on workers are alive
+    CLOSE_TIMEOUT = 10.0     # [s] before a worker that does not exit is terminated
+
+    def __init__(self, env_fns, start_method=None, info_keys=("episode",)):
+        self.waiting = False
+        self.closed = False
+        self.info_keys = None if info_keys is None else tuple(info_keys)
+        n_envs = len(env_fns)
+
+        if start_method is None:
+            forkserver_available = "forkserver" in mp.get_all_start_methods()
+            start_method = "forkserver" if forkserver_available else "spawn"
+        ctx = mp.get_context(start_method)
+
+        self._starts = [ctx.Semaphore(0) for _ in range(n_envs)]
+        self._done = ctx.Semaphore(0)
+        self.remotes, work_remotes = zip(*[ctx.Pipe() for _ in range(n_envs)])
+        self.processes = []
+        for i, (work_remote, env_fn) in enumerate(zip(work_remotes, env_fns)):
+            args = (i, work_remote, CloudpickleWrapper(env_fn),
+                    self._starts[i], self._done, self.info_keys)
+            # daemon=True: if the main process crashes, we should not cause things to hang
+            process = ctx.Process(target=_worker, args=args, daemon=True)
+            process.start()
+            self.processes.append(process)
+            work_remote.close()
+
+        # Spaces come from worker 0, then every worker attaches to the buffers
+        self.remotes[0].send(("get_spaces", None))
+        observation_space, action_space, render_mode = self.remotes[0].recv()
+
+        layouts = _layouts(n_envs, observation_space, action_space)
+        self._blocks = [SharedMemory(create=True, size=_nbytes(layout)) for layout in layouts]
+        (self._obs, self._term_obs, self._actions, self._rewards, self._terminated,
+         self._truncated, self._has_info, self._error, self._command) = (
+            _view(block, layout) for block, layout in zip(self._blocks, layouts)
+        )
+        self._error[:] = False
+        self._has_info[:] = False
+        block_names = [block.name for block in self._blocks]
+        for remote in self.remotes:
+            remote.send(("attach", (block_names, layouts)))
+
+        super().__init__(n_envs, observation_space, action_space)
+        self.render_mode = render_mode
+
+    # --------------------------------------------------
+    # SYNCHRONISATION
+    # --------------------------------------------------
+    def _dispatch(self, indices, cmd):
+        for i in indices:
+            self._command[i] = cmd
+            self._starts[i].release()
+
+    def _wait(self, indices, replies):
+        """
+        Wait for `indices` and receive what each of them sent: the reply of a
+        pipe command if `replies`, else the infos of workers flagged has_info.
+        Every pending message is read even if some worker failed, so the pipes
+        stay in sync for later calls; the first failure is then re-raised.
+        """
+        pending = len(indices)
+        while pending:
+            if self._done.acquire(timeout=self.LIVENESS_INTERVAL):
+                pending -= 1
+                continue
+            # A worker that died (segfault, OOM kill, ...) will never answer
+            dead = [i for i in indices if not self.processes[i].is_alive()]
+            if dead:
+                exitcode = self.processes[dead[0]].exitcode
+                raise EOFError(f"Worker {dead[0]} died (exit code {exitcode})")
+
+        messages = {}
+        failed = []
+        for i in indices:
+            if self._error[i]:
+                failed.append(i)
+            if replies or self._error[i] or self._has_info[i]:
+                messages[i] = self.remotes[i].recv()
+
+        if failed:
+            self._error[:] = False
+            exc, tb = messages[failed[0]]
+            raise exc from RuntimeError(f"in worker {failed[0]}:\n{tb}")
+        return messages
+
+    def _call(self, name, data, indices=None):
+        indices = list(self._get_indices(indices))
+        # Release the workers first: they are then blocked in recv(), so a
+        # payload larger than the pipe buffer cannot block this send
+        self._dispatch(indices, PIPE)
+        for i in indices:
+            self.remotes[i].send((name, data[i] if isinstance(data, list) else data))
+        messages = self._wait(indices, replies=True)
+        return [messages[i] for i in indices]
+
+    # --------------------------------------------------
+    # VECENV API
+    # --------------------------------------------------
+    def step_async(self, actions):
+        self._actions[:] = np.asarray(actions).reshape(self._actions.shape)
+        self._dispatch(range(self.num_envs), STEP)
+        self.waiting = True
+
+    def step_wait(self):
+        self.waiting = False
+        messages = self._wait(range(self.num_envs), replies=False)
+
+        dones = self._terminated | self._truncated
+        infos = [{} for _ in range(self.num_envs)]
+        for i in range(self.num_envs):
+            reset_info = {}
+            if i in messages:
+                info, reset_info = messages[i]
+                infos[i].update(info)
+            infos[i]["TimeLimit.truncated"] = bool(self._truncated[i] and not self._terminated[i])
+            if dones[i]:
+                infos[i]["terminal_observation"] = self._term_obs[i].copy()
+                self.reset_infos[i] = reset_info
+
+        return self._obs.copy(), self._rewards.copy(), dones, infos
+
+    def reset(self):
+        data = [(self._seeds[i], self._options[i]) for i in range(self.num_envs)]
+        self.reset_infos = self._call("reset", data)
+        # Seeds and options are only used once
+        self._reset_seeds()
+        self._reset_options()
+        return self._obs.copy()
+
+    def close(self):
+        if self.closed:
+            return
+        if self.waiting:
+            try:
+                self._wait(range(self.num_envs), replies=False)
+            except Exception:
+                pass
+        self._dispatch(range(self.num_envs), CLOSE)
+        for process in self.processes:
+            # Workers left mid-command by a dead sibling may never see CLOSE
+            process.join(self.CLOSE_TIMEOUT)
+            if process.is_alive():
+                process.terminate()
+
+        del (self._obs, self._term_obs, self._actions, self._rewards, self._terminated,
+             self._truncated, self._has_info, self._error, self._command)
+        for block in self._blocks:
+            block.close()
+            block.unlink()
+        self.closed = True
+
+    def get_images(self):
+        if self.render_mode != "rgb_array":
+            return [None for _ in self.remotes]
+        return self._call("render", None)
+
+    def get_attr(self, attr_name, indices=None):
+        return self._call("get_attr", attr_name, indices)
+
+    def set_attr(self, attr_name, value, indices=None):
+        self._call("set_attr", (attr_name, value), indices)
+
+    def env_method(self, method_name, *method_args, indices=None, **method_kwargs):
+        return self._call("env_method", (method_name, method_args, method_kwargs), indices)
+
+    def env_is_wrapped(self, wrapper_class, indices=None):
+        return self._call("is_wrapped", wrapper_class, indices)
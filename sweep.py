@@ -0,0 +1,226 @@
+import __init__
+import math
+import multiprocessing as mp
+import os
+import random
+import shutil
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import pandas as pd
+import torch as th
+from sb3_contrib import QRDQN
+from stable_baselines3.common.vec_env import DummyVecEnv, VecNormalize
+
+from train_dqn import (
+    OUTDIR,
+    PHASE1_TIMESTEPS,
+    PHASE2_TIMESTEPS,
+    QRDQN_HYPERPARAMS,
+    TOTAL_TIMESTEPS,
+    create_env,
+    three_phase_schedule,
+)
+
+SWEEP_DIR = f"{OUTDIR}/sweep"
+RESULTS_FILE = f"{SWEEP_DIR}/results.csv"
+
+SEARCH_SPACE = {
+    "gamma": [0.96, 0.99, 0.999, 0.9999],
+    "batch_size": [128, 256, 512],
+    "buffer_size": [200_000, 500_000, 1_000_000],
+    "n_quantiles": [25, 50, 100],
+    "lr_phase1": [1e-3, 5e-4, 3e-4],
+    "lr_phase2": [5e-4, 3e-4, 1e-4],
+    "lr_phase3": [1e-4, 5e-5],
+}
+
+N_TRIALS = 16
+ETA = 2                    # keep the best 1/ETA trials at every rung
+MIN_BUDGET = 75_000        # timesteps of the first rung (past learning_starts)
+MAX_BUDGET = TOTAL_TIMESTEPS
+N_WORKERS = os.cpu_count()
+SEED = 0
+
+SCORE_WINDOW = 100         # episodes of the monitor log used for scoring
+CRASH_PENALTY = 100.0      # score = rolling return - CRASH_PENALTY * crash rate
+
+
+def sample_configs(n_trials, seed=SEED):
+    """Draw distinct random configurations from SEARCH_SPACE."""
+    rng = random.Random(seed)
+    n_total = math.prod(len(values) for values in SEARCH_SPACE.values())
+    configs = []
+    while len(configs) < min(n_trials, n_total):
+        config = {name: rng.choice(values) for name, values in SEARCH_SPACE.items()}
+        if config not in configs:
+            configs.append(config)
+    return configs
+
+
+def rung_budgets(min_budget=MIN_BUDGET, max_budget=MAX_BUDGET, eta=ETA):
+    """Cumulative timestep budgets of each rung, growing by ETA up to max_budget."""
+    budgets = []
+    budget = min_budget
+    while budget < max_budget:
+        budgets.append(budget)
+        budget *= eta
+    budgets.append(max_budget)
+    return budgets
+
+
+def score_monitor(monitor_path, window=SCORE_WINDOW):
+    """Score a trial on the rolling return and crash rate of its latest episodes."""
+    df = pd.read_csv(monitor_path, skiprows=1)
+    if df.empty:
+        return -math.inf, math.nan, math.nan
+
+    recent = df.tail(window)
+    mean_return = recent["r"].mean()
+    crash_rate = recent["crashed"].astype(float).mean()
+    return mean_return - CRASH_PENALTY * crash_rate, mean_return, crash_rate
+
+
+def trial_seed(trial_id, rung):
+    """Seed of a trial at a rung, so every rung plays new scenarios."""
+    return SEED + trial_id + 1000 * rung
+
+
+def run_trial(trial_id, config, budget, rung, max_budget=MAX_BUDGET):
+    """
+    Train one configuration up to `budget` cumulative timesteps.
+
+    Trials resume from their previous rung's checkpoint (model, replay buffer
+    and VecNormalize stats), so surviving a rung costs only the extra steps.
+    """
+    th.set_num_threads(1)  # one core per trial, the pool provides the parallelism
+
+    trial_dir = f"{SWEEP_DIR}/trial_{trial_id:03d}"
+    os.makedirs(trial_dir, exist_ok=True)
+    model_path = f"{trial_dir}/model.zip"
+    buffer_path = f"{trial_dir}/replay_buffer.pkl"
+    stats_path = f"{trial_dir}/vec_normalize_stats.pkl"
+    monitor_path = f"{trial_dir}/monitor.csv"
+
+    resume = os.path.exists(model_path)
+    env = DummyVecEnv([lambda: create_env(monitor_path=monitor_path,
+                                          override_existing=not resume)])
+
+    # Phase boundaries stay where a full-length run would put them
+    schedule = three_phase_schedule(
+        PHASE1_TIMESTEPS * max_budget // TOTAL_TIMESTEPS,
+        PHASE2_TIMESTEPS * max_budget // TOTAL_TIMESTEPS,
+        config["lr_phase1"],
+        config["lr_phase2"],
+        config["lr_phase3"],
+        total_steps=budget,
+    )
+
+    if resume:
+        env = VecNormalize.load(stats_path, env)
+        model = QRDQN.load(model_path, env=env, device="cpu")
+        model.load_replay_buffer(buffer_path)
+        model.lr_schedule = schedule
+        # load() reseeds with the rung-0 seed, which would replay the same
+        # scenarios and exploration as the first rung
+        model.set_random_seed(trial_seed(trial_id, rung))
+    else:
+        env = VecNormalize(env, norm_obs=True, norm_reward=True, clip_obs=10.)
+        hyperparams = dict(QRDQN_HYPERPARAMS)
+        hyperparams.update(
+            learning_rate=schedule,
+            gamma=config["gamma"],
+            batch_size=config["batch_size"],
+            buffer_size=config["buffer_size"],
+        )
+        model = QRDQN(
+            "MlpPolicy",
+            env,
+            verbose=0,
+            device="cpu",
+            seed=trial_seed(trial_id, rung),
+            policy_kwargs=dict(n_quantiles=config["n_quantiles"]),
+            **hyperparams
+        )
+
+    model.learn(
+        total_timesteps=budget - model.num_timesteps,
+        reset_num_timesteps=False,
+    )
+
+    model.save(model_path)
+    model.save_replay_buffer(buffer_path)
+    env.save(stats_path)
+    env.close()
+
+    return score_monitor(monitor_path)
+
+
+def successive_halving(n_trials=N_TRIALS, min_budget=MIN_BUDGET, max_budget=MAX_BUDGET,
+                       eta=ETA, n_workers=N_WORKERS):
+    """
+    Run the sweep: every rung trains all surviving trials concurrently, then
+    only the best 1/eta move on to the next, larger budget.
+    """
+    os.makedirs(SWEEP_DIR, exist_ok=True)
+    configs = sample_configs(n_trials)
+    budgets = rung_budgets(min_budget, max_budget, eta)
+    alive = list(range(len(configs)))
+    rows = []
+
+    # "spawn" so that each worker gets its own clean torch runtime
+    with ProcessPoolExecutor(max_workers=n_workers, mp_context=mp.get_context("spawn")) as pool:
+        for rung, budget in enumerate(budgets):
+            print(f"\nRung {rung}: {len(alive)} trials up to {budget} timesteps")
+
+            futures = {
+                pool.submit(run_trial, i, configs[i], budget, rung, max_budget): i
+                for i in alive
+            }
+            scores = {}
+            for future in as_completed(futures):
+                i = futures[future]
+                try:
+                    score, mean_return, crash_rate = future.result()
+                except Exception as e:
+                    print(f"Trial {i} failed: {e}")
+                    score, mean_return, crash_rate = -math.inf, math.nan, math.nan
+
+                scores[i] = score
+                rows.append(dict(trial=i, rung=rung, budget=budget, score=score,
+                                 mean_return=mean_return, crash_rate=crash_rate,
+                                 **configs[i]))
+                print(f"  trial {i:3d}: score={score:9.2f} return={mean_return:9.2f} "
+                      f"crash_rate={crash_rate:.2f}")
+
+            pd.DataFrame(rows).to_csv(RESULTS_FILE, index=False)
+
+            alive.sort(key=lambda i: scores[i], reverse=True)
+            if rung < len(budgets) - 1:
+                keep = max(1, len(alive) // eta)
+                for i in alive[keep:]:
+                    # Stopped trials keep their model and log, but not the large buffer
+                    buffer_path = f"{SWEEP_DIR}/trial_{i:03d}/replay_buffer.pkl"
+                    if os.path.exists(buffer_path):
+                        os.remove(buffer_path)
+                print(f"Stopping trials {alive[keep:]}")
+                alive = alive[:keep]
+
+    best = alive[0]
+    best_dir = f"{SWEEP_DIR}/trial_{best:03d}"
+    shutil.copy(f"{best_dir}/model.zip", f"{SWEEP_DIR}/best_model.zip")
+    shutil.copy(f"{best_dir}/vec_normalize_stats.pkl", f"{SWEEP_DIR}/best_vec_normalize_stats.pkl")
+    return best, configs[best]
+
+
+if __name__ == "__main__":
+    budgets = rung_budgets()
+    print(f"Sweeping {N_TRIALS} configurations on {N_WORKERS} workers")
+    print(f"Rung budgets: {budgets}")
+
+    best, config = successive_halving()
+
+    print(f"\nBest trial: {best}")
+    for name, value in config.items():
+        print(f"  {name}: {value}")
+    print(f"Results saved to {RESULTS_FILE}")
+    print(f"Best model saved to {SWEEP_DIR}/best_model.zip")
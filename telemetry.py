@@ -0,0 +1,248 @@
+import atexit
+import csv
+import glob
+import json
+import os
+import queue
+import threading
+import time
+
+import pandas as pd
+import pyarrow as pa
+from stable_baselines3.common.monitor import Monitor
+
+# Per-episode columns written after Monitor's r, l, t
+EPISODE_KEYS = ("crashed", "lane_changes", "construction_time", "speed_band_rate")
+# Per-step info entries recorded when step telemetry is on
+STEP_KEYS = ("speed", "lane_change", "in_construction_zone", "in_speed_band", "crashed")
+
+
+class TelemetrySink:
+    """
+    Background writer for episode (and optionally step) metrics.
+
+    Records are queued with `put_nowait` and written in batches by a daemon
+    thread, so the training loop never waits on disk. If the queue is full
+    (disk far slower than training), records are dropped and counted in
+    `dropped` rather than blocking.
+
+    Episodes go to two files:
+    - `monitor_path`, in SB3 Monitor format (`#{json}` header line, then
+      r,l,t and the extra columns), so existing monitor.csv readers keep working;
+    - `<monitor_path without .csv>.episodes.<n>.arrow`, an Arrow IPC stream
+      with one record batch per write.
+    Steps only go to `...steps.<n>.arrow`. Every sink opens a new part `<n>`,
+    so resumed runs append parts instead of rewriting a file; read them back
+    with `load_telemetry`.
+
+    :param monitor_path: path of the monitor.csv file
+    :param header: json header of the monitor file (t_start, env_id)
+    :param override_existing: remove earlier logs instead of appending to them
+    :param batch_size: write as soon as this many records are waiting
+    :param flush_interval: [s] write pending records at least this often
+    :param max_queue: records held in memory before new ones are dropped
+    """
+
+    def __init__(self, monitor_path, header, override_existing=True,
+                 batch_size=256, flush_interval=5.0, max_queue=100_000):
+        self.monitor_path = monitor_path
+        self.prefix = monitor_path[:-len(".csv")] if monitor_path.endswith(".csv") else monitor_path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.dropped = 0
+
+        if override_existing:
+            for path in glob.glob(f"{self.prefix}.*.arrow"):
+                os.remove(path)
+        fieldnames = ("r", "l", "t") + EPISODE_KEYS
+        append = not override_existing and os.path.exists(monitor_path)
+        if append:
+            # Keep the columns of the file being continued (e.g. a plain r,l,t Monitor log)
+            with open(monitor_path, newline="") as f:
+                f.readline()
+                fieldnames = next(csv.reader(f), fieldnames)
+        self._csv_file = open(monitor_path, "a" if append else "w", newline="")
+        self._csv = csv.DictWriter(self._csv_file, fieldnames=fieldnames, extrasaction="ignore")
+        if not append:
+            self._csv_file.write(f"#{json.dumps(header)}\n")
+            self._csv.writeheader()
+            self._csv_file.flush()
+
+        part = len(glob.glob(f"{self.prefix}.episodes.*.arrow"))
+        self._arrow_paths = {kind: f"{self.prefix}.{kind}.{part}.arrow"
+                             for kind in ("episodes", "steps")}
+        self._arrow_writers = {}  # kind -> (writer, schema)
+
+        self.closed = False
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    # --------------------------------------------------
+    # TRAINING THREAD
+    # --------------------------------------------------
+    def record_episode(self, row):
+        self._put(("episodes", row))
+
+    def record_step(self, row):
+        self._put(("steps", row))
+
+    def _put(self, item):
+        try:
+            self._queue.put_nowait(item)
+        except queue.Full:
+            self.dropped += 1
+
+    def close(self):
+        """Write everything still queued and close the files."""
+        if self.closed:
+            return
+        self.closed = True
+        if self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join()
+        atexit.unregister(self.close)
+
+    # --------------------------------------------------
+    # WRITER THREAD
+    # --------------------------------------------------
+    def _run(self):
+        pending = {"episodes": [], "steps": []}
+        deadline = time.monotonic() + self.flush_interval
+        running = True
+        while running:
+            try:
+                item = self._queue.get(timeout=max(deadline - time.monotonic(), 0))
+                if item is None:
+                    running = False
+                else:
+                    kind, row = item
+                    pending[kind].append(row)
+            except queue.Empty:
+                pass
+
+            n_pending = sum(len(rows) for rows in pending.values())
+            if not running or n_pending >= self.batch_size or time.monotonic() >= deadline:
+                for kind, rows in pending.items():
+                    if rows:
+                        try:
+                            self._write(kind, rows)
+                        except Exception as e:
+                            # Losing a batch is better than stopping the writer
+                            print(f"Telemetry: dropped {len(rows)} {kind} records ({e})")
+                            self.dropped += len(rows)
+                        pending[kind] = []
+                deadline = time.monotonic() + self.flush_interval
+
+        for writer, _ in self._arrow_writers.values():
+            writer.close()
+        self._csv_file.close()
+
+    def _write(self, kind, rows):
+        if kind == "episodes":
+            self._csv.writerows(rows)
+            self._csv_file.flush()
+
+        if kind not in self._arrow_writers:
+            # The first batch fixes the schema of this part
+            table = pa.Table.from_pylist(rows)
+            writer = pa.ipc.new_stream(self._arrow_paths[kind], table.schema)
+            self._arrow_writers[kind] = (writer, table.schema)
+        else:
+            writer, schema = self._arrow_writers[kind]
+            table = pa.Table.from_pylist(rows, schema=schema)
+        writer.write_table(table)
+
+
+def load_telemetry(monitor_path, kind="episodes"):
+    """Read every Arrow part written next to `monitor_path` into one DataFrame."""
+    prefix = monitor_path[:-len(".csv")] if monitor_path.endswith(".csv") else monitor_path
+    paths = sorted(glob.glob(f"{prefix}.{kind}.*.arrow"),
+                   key=lambda path: int(path.rsplit(".", 2)[-2]))
+    tables = []
+    for path in paths:
+        # A stream cut short by a crash is still readable up to its last full batch
+        batches = []
+        try:
+            with pa.OSFile(path) as source:
+                reader = pa.ipc.open_stream(source)
+                for batch in reader:
+                    batches.append(batch)
+        except pa.ArrowInvalid:
+            pass
+        if batches:
+            tables.append(pa.Table.from_batches(batches))
+    if not tables:
+        return pd.DataFrame()
+    return pa.concat_tables(tables, promote_options="default").to_pandas()
+
+
+class TelemetryMonitor(Monitor):
+    """
+    SB3 Monitor for the construction env that logs through a TelemetrySink.
+
+    Episode bookkeeping (`info["episode"]` with r, l, t, episode returns and
+    lengths) is Monitor's own, so SB3 logging, `evaluate_policy` and
+    `is_wrapped(env, Monitor)` behave as with a plain Monitor. Only the write
+    path differs: instead of a CSV line on the training thread, the episode
+    summary goes to the sink with crashed, lane_changes, construction_time
+    ([s] spent in the construction zone) and speed_band_rate (fraction of
+    policy periods within the speed band; with adaptive stepping one step can
+    cover several periods, see `info["policy_periods"]`).
+
+    :param env: the construction environment
+    :param filename: path of the monitor.csv file
+    :param override_existing: remove earlier logs instead of appending to them
+    :param log_steps: also record STEP_KEYS of every step
+    :param sink_kwargs: extra arguments of TelemetrySink
+    """
+
+    def __init__(self, env, filename, override_existing=True, log_steps=False, **sink_kwargs):
+        # No filename: Monitor's ResultsWriter is replaced by the sink
+        super().__init__(env)
+        env_id = env.spec.id if env.spec is not None else None
+        self.sink = TelemetrySink(filename, {"t_start": self.t_start, "env_id": str(env_id)},
+                                  override_existing=override_existing, **sink_kwargs)
+        self.log_steps = log_steps
+        self.episode = 0
+        self._start_episode()
+
+    def _start_episode(self):
+        self.lane_changes = 0
+        self.periods = 0
+        self.zone_periods = 0
+        self.band_periods = 0
+
+    def reset(self, **kwargs):
+        self._start_episode()
+        return super().reset(**kwargs)
+
+    def step(self, action):
+        obs, reward, terminated, truncated, info = super().step(action)
+        periods = info.get("policy_periods", 1)
+        self.lane_changes += info["lane_change"]
+        self.periods += periods
+        self.zone_periods += periods * info["in_construction_zone"]
+        self.band_periods += periods * info["in_speed_band"]
+
+        if self.log_steps:
+            row = {"episode": self.episode, "step": len(self.rewards), "reward": float(reward)}
+            row.update((key, info[key]) for key in STEP_KEYS)
+            self.sink.record_step(row)
+
+        if terminated or truncated:
+            ep_info = info["episode"]
+            self.sink.record_episode(dict(
+                ep_info,
+                crashed=bool(info["crashed"]),
+                lane_changes=self.lane_changes,
+                construction_time=self.zone_periods / self.unwrapped.config["policy_frequency"],
+                speed_band_rate=self.band_periods / self.periods,
+            ))
+            self.episode += 1
+        return obs, reward, terminated, truncated, info
+
+    def close(self):
+        super().close()
+        self.sink.close()
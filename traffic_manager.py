@@ -0,0 +1,78 @@
+from vehicle_pool import place_vehicle
+
+
+class TrafficManager:
+    """
+    Keeps a fixed-size window of traffic around the ego vehicle.
+
+    - Traffic cars more than `behind` metres behind the ego (or that ran
+      off more than `ahead` metres in front of it) are despawned into a
+      pool instead of being simulated for nothing
+    - Pooled cars are respawned between `spawn_min` and `ahead` metres in
+      front of the ego, on a free spot of a random highway lane
+    - The ego and the construction cones are never touched
+
+    The number of simulated vehicles never exceeds the initial traffic, so
+    the per-step cost stays flat however long the highway is.
+    """
+
+    def __init__(self, env, behind=100.0, ahead=300.0, spawn_min=150.0,
+                 min_gap=20.0, attempts=5):
+        self.env = env
+        self.behind = behind
+        self.ahead = ahead
+        self.spawn_min = spawn_min
+        self.min_gap = min_gap
+        self.attempts = attempts
+        self.active = []
+        self.pool = []
+
+    def reset(self, traffic):
+        """Start tracking a freshly spawned set of traffic vehicles."""
+        self.active = list(traffic)
+        self.pool = []
+
+    def update(self):
+        """Despawn cars outside the window, then respawn pooled cars ahead of the ego."""
+        road = self.env.road
+        ego_x = self.env.vehicle.position[0]
+
+        for v in list(self.active):
+            dx = v.position[0] - ego_x
+            if dx < -self.behind or dx > self.ahead:
+                self.active.remove(v)
+                road.vehicles.remove(v)
+                self.pool.append(v)
+
+        for v in list(self.pool):
+            if not self._respawn(v, ego_x):
+                break  # no room ahead right now, try again next step
+            self.pool.remove(v)
+            self.active.append(v)
+            road.vehicles.append(v)
+
+    def _respawn(self, vehicle, ego_x):
+        env = self.env
+        rng = env.np_random
+        end = env.config["highway_length"] - self.min_gap
+
+        for _ in range(self.attempts):
+            s = ego_x + rng.uniform(self.spawn_min, self.ahead)
+            if s > end:
+                continue
+            lane_index = ("a", "b", int(rng.integers(env.config["lanes_count"])))
+            if not self._is_free(lane_index, s):
+                continue
+            speed = env.BASE_SPEED + rng.uniform(-0.5, 0.5)
+            place_vehicle(vehicle, env.road, lane_index, s, speed)
+            return True
+        return False
+
+    def _is_free(self, lane_index, s):
+        lane = self.env.road.network.get_lane(lane_index)
+        for v in self.env.road.vehicles:
+            s_v, lat_v = lane.local_coordinates(v.position)
+            if abs(lat_v) < lane.width_at(s_v) / 2 and abs(s_v - s) < self.min_gap:
+                return False
+        return True
+
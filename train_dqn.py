@@ -6,14 +6,16 @@ import os
 import torch as th 
 from typing import Callable 
 from sb3_contrib import QRDQN
-from stable_baselines3.common.monitor import Monitor
 from stable_baselines3.common.vec_env import DummyVecEnv, VecNormalize
 from torch import nn 
 
+from curriculum import CurriculumCallback
+from telemetry import TelemetryMonitor
+
 MODEL_NAME = "qrdqn_agent_low_gamma_96"
 OUTDIR = "data"
 FILE_NAME_ZIP = f"{MODEL_NAME}_final.zip"
-VEC_NORM_STATS_FILE = f"{OUTDIR}/vec_normalize_stats.pkl"
+VEC_NORM_STATS_FILE = f"{OUTDIR}/{MODEL_NAME}_vec_normalize_stats.pkl"
 
 PHASE1_TIMESTEPS = 100000 
 PHASE2_TIMESTEPS = 200000 
@@ -34,16 +36,25 @@ ENV_CONFIG = {
     "duration": 120,
 }
 
+# Traffic density per LR phase: sparse while exploring, full density
+# (the env default, used for evaluation) for fine-tuning
+CURRICULUM = [
+    (0, {"vehicles_count": 6}),
+    (PHASE1_TIMESTEPS, {"vehicles_count": 12}),
+    (PHASE1_TIMESTEPS + PHASE2_TIMESTEPS, {"vehicles_count": 18}),
+]
+
 os.makedirs(OUTDIR, exist_ok=True)
 
-def three_phase_schedule(p1_steps: int, p2_steps: int, lr1: float, lr2: float, lr3: float) -> Callable[[float], float]:
+def three_phase_schedule(p1_steps: int, p2_steps: int, lr1: float, lr2: float, lr3: float,
+                         total_steps: int = TOTAL_TIMESTEPS) -> Callable[[float], float]:
     """Custom learning rate schedule based on total steps completed."""
     def func(progress_remaining: float) -> float:
 
         progress_completed = 1.0 - progress_remaining
         
         # Calculate steps completed based on total timesteps
-        timesteps_completed = progress_completed * TOTAL_TIMESTEPS
+        timesteps_completed = progress_completed * total_steps
         
         boundary_1 = p1_steps
         boundary_2 = p1_steps + p2_steps
@@ -57,16 +68,18 @@ def three_phase_schedule(p1_steps: int, p2_steps: int, lr1: float, lr2: float, l
             
     return func
 
-def create_env(monitor_path=None):
+def create_env(monitor_path=None, override_existing=True, config=None):
     """Creates the highway-construction environment with custom configuration."""
     env = gym.make(
         "highway-construction-v0",
         render_mode="rgb_array", 
     )
-    env.unwrapped.configure(ENV_CONFIG)
+    env.unwrapped.configure({**ENV_CONFIG, **(config or {})})
 
     if monitor_path:
-        env = Monitor(env, monitor_path) 
+        # Episode log (r/l/t, crashes, lane changes, construction-zone time,
+        # speed-band compliance) written in batches off the training thread
+        env = TelemetryMonitor(env, monitor_path, override_existing=override_existing)
     return env
 
 POLICY_KWARGS = dict(
@@ -92,7 +105,9 @@ QRDQN_HYPERPARAMS = dict(
 
 if __name__ == "__main__":
     
-    train_env = DummyVecEnv([lambda: create_env(monitor_path=f"{OUTDIR}/monitor.csv")])
+    # Start on the first curriculum stage; the callback moves on from there
+    train_env = DummyVecEnv([lambda: create_env(monitor_path=f"{OUTDIR}/monitor.csv",
+                                                config=CURRICULUM[0][1])])
     train_env = VecNormalize(train_env, norm_obs=True, norm_reward=True, clip_obs=10.)
 
     model = QRDQN(
@@ -111,12 +126,15 @@ if __name__ == "__main__":
     print(f"Phase 2 (LR={LR_PHASE2}) for {PHASE2_TIMESTEPS} timesteps.")
     print(f"Phase 3 (LR={LR_PHASE3}) for {PHASE3_TIMESTEPS} timesteps.")
     print(f"Total training duration: {TOTAL_TIMESTEPS} timesteps.")
+    for start, config in CURRICULUM:
+        print(f"Curriculum from {start} timesteps: {config}")
 
 
     try:
         model.learn(
             total_timesteps=TOTAL_TIMESTEPS,
             log_interval=1,
+            callback=CurriculumCallback(CURRICULUM, verbose=1),
         )
         print("\nTraining completed successfully without interruption.")
 